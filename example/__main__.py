@@ -10,6 +10,62 @@ import sys
 import totalhelp
 
 
+class _LazySubParsersAction(argparse._SubParsersAction):
+    """A `_SubParsersAction` that resolves lazily-built subparsers on dispatch.
+
+    Subparsers registered via `lazy_subparser` carry a deferred builder; we run
+    it just before argparse hands control to the chosen subparser, so only the
+    command actually invoked pays its construction cost.
+    """
+
+    # Lets totalhelp's walker recognize this subclass without isinstance.
+    _TOTALHELP_SUBPARSER = True
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        if values:
+            chosen = self._name_parser_map.get(values[0])
+            if chosen is not None:
+                _resolve_lazy(chosen)
+        super().__call__(parser, namespace, values, option_string)
+
+
+def lazy_subparser(
+    subparsers, name, help, builder
+):  # pylint: disable=redefined-builtin
+    """Register a subparser whose arguments are only added when needed.
+
+    `builder(p)` receives the bare subparser and adds its arguments (and any
+    nested subparsers). It runs the first time the command is dispatched or the
+    first time full help is requested via `resolve_all_lazy`.
+    """
+    p = subparsers.add_parser(name, help=help)
+    p._lazy_builder = builder
+    return p
+
+
+def _resolve_lazy(parser: argparse.ArgumentParser) -> None:
+    """Run a deferred builder for a single subparser, at most once."""
+    builder = getattr(parser, "_lazy_builder", None)
+    if builder is not None:
+        parser._lazy_builder = None
+        builder(parser)
+
+
+def resolve_all_lazy(parser: argparse.ArgumentParser) -> None:
+    """Force every deferred subparser builder so the full tree exists.
+
+    Call this before handing the parser to `totalhelp.full_help_from_parser`
+    so the monolithic help output is identical to an eagerly-built parser.
+    """
+    q = [parser]
+    while q:
+        current = q.pop()
+        _resolve_lazy(current)
+        for action in current._actions:
+            if isinstance(action, argparse._SubParsersAction):
+                q.extend(action.choices.values())
+
+
 def create_parser() -> argparse.ArgumentParser:
     """Builds the ArgumentParser object for our example CLI."""
     parser = argparse.ArgumentParser(
@@ -18,51 +74,65 @@ def create_parser() -> argparse.ArgumentParser:
         epilog="Thanks for using our fake tool!",
     )
     subparsers = parser.add_subparsers(
-        dest="command", title="Available Commands", required=True
+        dest="command",
+        title="Available Commands",
+        required=True,
+        action=_LazySubParsersAction,
     )
 
     # --- 'remote' command with its own subcommands ---
-    remote_parser = subparsers.add_parser(
-        "remote", help="Manage set of tracked repositories."
-    )
-    remote_subparsers = remote_parser.add_subparsers(
-        dest="remote_command", title="Remote Commands", required=True
-    )
+    def _build_remote(remote_parser: argparse.ArgumentParser) -> None:
+        remote_subparsers = remote_parser.add_subparsers(
+            dest="remote_command",
+            title="Remote Commands",
+            required=True,
+            action=_LazySubParsersAction,
+        )
 
-    # `git remote add`
-    remote_add_parser = remote_subparsers.add_parser(
-        "add", help="Add a remote repository."
-    )
-    remote_add_parser.add_argument("name", help="Name for the new remote.")
-    remote_add_parser.add_argument("url", help="URL for the new remote.")
+        # `git remote add`
+        def _build_add(p: argparse.ArgumentParser) -> None:
+            p.add_argument("name", help="Name for the new remote.")
+            p.add_argument("url", help="URL for the new remote.")
+
+        lazy_subparser(remote_subparsers, "add", "Add a remote repository.", _build_add)
+
+        # `git remote remove`
+        def _build_remove(p: argparse.ArgumentParser) -> None:
+            p.add_argument("name", help="Name of the remote to remove.")
 
-    # `git remote remove`
-    remote_remove_parser = remote_subparsers.add_parser(
-        "remove", help="Remove a remote."
+        lazy_subparser(remote_subparsers, "remove", "Remove a remote.", _build_remove)
+
+    lazy_subparser(
+        subparsers, "remote", "Manage set of tracked repositories.", _build_remote
     )
-    remote_remove_parser.add_argument("name", help="Name of the remote to remove.")
 
     # --- 'log' command ---
-    log_parser = subparsers.add_parser("log", help="Show commit logs.")
-    log_parser.add_argument(
-        "--oneline", action="store_true", help="Show logs in a compact one-line format."
-    )
-    log_parser.add_argument(
-        "-n", "--max-count", type=int, help="Limit the number of commits to show."
-    )
+    def _build_log(log_parser: argparse.ArgumentParser) -> None:
+        log_parser.add_argument(
+            "--oneline",
+            action="store_true",
+            help="Show logs in a compact one-line format.",
+        )
+        log_parser.add_argument(
+            "-n", "--max-count", type=int, help="Limit the number of commits to show."
+        )
+
+    lazy_subparser(subparsers, "log", "Show commit logs.", _build_log)
 
     # --- 'config' command ---
-    config_parser = subparsers.add_parser(
-        "config", help="Get and set repository or global options."
-    )
-    config_parser.add_argument(
-        "--global",
-        action="store_true",
-        dest="is_global",
-        help="Use global configuration file.",
+    def _build_config(config_parser: argparse.ArgumentParser) -> None:
+        config_parser.add_argument(
+            "--global",
+            action="store_true",
+            dest="is_global",
+            help="Use global configuration file.",
+        )
+        config_parser.add_argument("key", help="Configuration key (e.g., user.name).")
+        config_parser.add_argument("value", nargs="?", help="Value to set for the key.")
+
+    lazy_subparser(
+        subparsers, "config", "Get and set repository or global options.", _build_config
     )
-    config_parser.add_argument("key", help="Configuration key (e.g., user.name).")
-    config_parser.add_argument("value", nargs="?", help="Value to set for the key.")
 
     return parser
 
@@ -78,17 +148,19 @@ def main():
     args = parser.parse_args()
 
     # STEP 3: Check if the totalhelp flag was passed and handle it.
-    if getattr(args, "totalhelp", False):
-        # Generate the monolithic help document
-        doc = totalhelp.full_help_from_parser(
-            parser, fmt=getattr(args, "format", "text")
-        )
+    # One dict probe beats getattr-with-default, which goes through
+    # __getattribute__ and exception handling for missing names.
+    if args.__dict__.get("totalhelp"):
+        # Build any still-deferred subparsers so the full tree is rendered.
+        resolve_all_lazy(parser)
+        # Fetch the output options once instead of re-running getattr per use.
+        fmt = getattr(args, "format", "text")
+        open_browser = getattr(args, "open", False)
+        # Generate the monolithic help document (compact: identical
+        # subparser help blocks are emitted once).
+        doc = totalhelp.full_help_from_parser(parser, fmt=fmt, dedupe=True)
         # Print it using the helper (which handles HTML file creation)
-        totalhelp.print_output(
-            doc,
-            fmt=getattr(args, "format", "text"),
-            open_browser=getattr(args, "open", False),
-        )
+        totalhelp.print_output(doc, fmt=fmt, open_browser=open_browser)
         # Exit cleanly
         sys.exit(0)
 
@@ -0,0 +1,10 @@
+"""Make the repository root importable before test collection.
+
+Unnecessary when totalhelp is installed editable (`pip install -e .`),
+but keeps a bare checkout runnable with plain `pytest`.
+"""
+
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
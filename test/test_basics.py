@@ -3,7 +3,8 @@ Tests for the totalhelp module.
 """
 
 import argparse
-import sys
+import io
+import subprocess
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -13,16 +14,12 @@ from totalhelp.library import (
     _walk_parser_tree,
     add_totalhelp_flag,
     full_help_from_parser,
+    full_help_from_parser_iter,
 )
 
-# We need to add the parent directory to the path to import totalhelp
-# In a real package installation, this wouldn't be necessary.
-sys.path.insert(0, ".")
 
-
-@pytest.fixture
-def complex_parser():
-    """Provides a parser with nested subcommands for testing."""
+def _build_complex_parser():
+    """Construct a parser with nested subcommands for testing."""
     parser = argparse.ArgumentParser(prog="cli", description="A test CLI.")
     subparsers = parser.add_subparsers(dest="command")
 
@@ -39,9 +36,22 @@ def complex_parser():
     return parser
 
 
-def test_walk_parser_tree(complex_parser):
+@pytest.fixture
+def complex_parser():
+    """A fresh parser, for tests that mutate it."""
+    return _build_complex_parser()
+
+
+@pytest.fixture(scope="module")
+def shared_complex_parser():
+    """One parser shared across read-only tests; parser construction and
+    help formatting are not cheap, so don't repeat them per test."""
+    return _build_complex_parser()
+
+
+def test_walk_parser_tree(shared_complex_parser):
     """Test that the walker finds all parsers."""
-    nodes = list(_walk_parser_tree(complex_parser))
+    nodes = list(_walk_parser_tree(shared_complex_parser))
     paths = {" ".join(n.path) for n in nodes}
 
     assert len(nodes) == 4
@@ -51,22 +61,24 @@ def test_walk_parser_tree(complex_parser):
     assert "cmd2 sub1" in paths
 
 
-def test_prog_override(complex_parser):
+def test_prog_override(shared_complex_parser):
     """Test that the 'prog' argument correctly overrides the parser's program name."""
-    doc_default = full_help_from_parser(complex_parser, fmt="text")
+    doc_default = full_help_from_parser(shared_complex_parser, fmt="text")
     assert "usage: cli" in doc_default
 
-    doc_override = full_help_from_parser(complex_parser, prog="my-app", fmt="text")
+    doc_override = full_help_from_parser(
+        shared_complex_parser, prog="my-app", fmt="text"
+    )
     assert "my-app" in doc_override
     assert "$ my-app --help" in doc_override
     assert "$ my-app cmd1 --help" in doc_override
     # Also check that the original parser is not mutated
-    assert complex_parser.prog == "cli"
+    assert shared_complex_parser.prog == "cli"
 
 
-def test_text_format(complex_parser):
+def test_text_format(shared_complex_parser):
     """Test plain text output format."""
-    output = full_help_from_parser(complex_parser, fmt="text")
+    output = full_help_from_parser(shared_complex_parser, fmt="text")
     assert "$ cli --help" in output
     assert "A test CLI." in output
     assert "$ cli cmd1 --help" in output
@@ -76,9 +88,9 @@ def test_text_format(complex_parser):
     assert "usage: cli cmd2 sub1" in output
 
 
-def test_md_format(complex_parser):
+def test_md_format(shared_complex_parser):
     """Test Markdown output format."""
-    output = full_help_from_parser(complex_parser, fmt="md")
+    output = full_help_from_parser(shared_complex_parser, fmt="md")
     assert "# Help for `cli`" in output
     assert "## `cli`" in output
     assert "### `cli cmd1`" in output
@@ -86,23 +98,49 @@ def test_md_format(complex_parser):
     assert "```text" in output
 
 
-def test_html_format(complex_parser):
+def test_html_format(shared_complex_parser):
     """Test HTML output format."""
-    output = full_help_from_parser(complex_parser, fmt="html")
+    output = full_help_from_parser(shared_complex_parser, fmt="html")
     assert "<!DOCTYPE html>" in output
 
 
+def test_formatter_class_without_width_kwarg():
+    """Formatter classes that only take `prog` must not break rendering."""
+    parser = argparse.ArgumentParser(
+        prog="cli",
+        description="A test CLI.",
+        formatter_class=lambda prog: argparse.HelpFormatter(prog, max_help_position=40),
+    )
+    parser.add_argument("--foo", action="store_true", help="Foo option")
+
+    output = full_help_from_parser(parser, fmt="text")
+    assert "$ cli --help" in output
+    assert "Foo option" in output
+
+
+def test_iter_invalid_format_raises_eagerly(shared_complex_parser):
+    """A bad fmt must raise at call time, not on the first next()."""
+    with pytest.raises(ValueError, match="Invalid format"):
+        full_help_from_parser_iter(shared_complex_parser, fmt="bogus")
+
+
 def test_add_totalhelp_flag(complex_parser):
     """Test that the flags are added correctly to a parser."""
     add_totalhelp_flag(complex_parser)
     help_text = complex_parser.format_help()
 
-    assert "--totalhelp" in help_text
     assert "--totalhelp" in help_text
     assert "--format {text,md,html}" in help_text
     assert "--open" in help_text
 
 
+def test_print_output_html_dest():
+    """HTML output can go to an in-memory stream, skipping the temp file."""
+    buf = io.StringIO()
+    print_output("<html>...</html>", fmt="html", dest=buf)
+    assert buf.getvalue() == "<html>...</html>"
+
+
 @patch("totalhelp.__main__.webbrowser")
 @patch("tempfile.NamedTemporaryFile")
 def test_print_output_html(mock_tempfile, mock_webbrowser):
@@ -122,26 +160,39 @@ def test_print_output_html(mock_tempfile, mock_webbrowser):
     # mock_webbrowser.open.assert_called_once_with("file:///tmp/fake.html")
 
 
-@patch("subprocess.run")
-def test_full_help_external(mock_run):
+@patch("totalhelp.external.shutil.which", return_value="/usr/bin/pip")
+@patch("subprocess.Popen")
+def test_full_help_external(mock_popen, mock_which):
     """Test the external command runner."""
-    # Mock the return values for subprocess calls
-    mock_root = MagicMock()
-    mock_root.stdout = "usage: pip <command> [...]\n\nCommands:\n  install    Install packages.\n  uninstall  Uninstall packages.\n"
-    mock_root.stderr = ""
-    mock_root.returncode = 0
-
-    mock_install = MagicMock()
-    mock_install.stdout = "usage: pip install [options] <package>"
-    mock_install.stderr = ""
-    mock_install.returncode = 0
-
-    mock_uninstall = MagicMock()
-    mock_uninstall.stdout = "usage: pip uninstall [options] <package>"
-    mock_uninstall.stderr = ""
-    mock_uninstall.returncode = 0
-
-    mock_run.side_effect = [mock_root, mock_install, mock_uninstall]
+    # The PATH lookup and --help output are cached across calls; reset both
+    # so this test sees the patched shutil.which and subprocess.Popen.
+    from totalhelp.external import _which, clear_help_cache
+
+    _which.cache_clear()
+    clear_help_cache()
+
+    def _proc(stdout: bytes) -> MagicMock:
+        proc = MagicMock()
+        proc.communicate.return_value = (stdout, b"")
+        proc.returncode = 0
+        return proc
+
+    # Mock the spawned processes (raw bytes, as captured). Child --help
+    # calls run concurrently, so key responses on the command line rather
+    # than relying on call order.
+    responses = {
+        (
+            "pip",
+            "--help",
+        ): _proc(
+            b"usage: pip <command> [...]\n\nCommands:\n  install    Install packages.\n  uninstall  Uninstall packages.\n"
+        ),
+        ("pip", "install", "--help"): _proc(b"usage: pip install [options] <package>"),
+        ("pip", "uninstall", "--help"): _proc(
+            b"usage: pip uninstall [options] <package>"
+        ),
+    }
+    mock_popen.side_effect = lambda cmd, **kwargs: responses[tuple(cmd)]
 
     output = full_help_external(["pip"], fmt="text")
 
@@ -152,22 +203,21 @@ def test_full_help_external(mock_run):
     assert "$ pip uninstall --help" in output
     assert "usage: pip uninstall" in output
 
-    assert mock_run.call_count == 3
-    mock_run.assert_any_call(
+    assert mock_popen.call_count == 3
+    mock_popen.assert_any_call(
         ["pip", "--help"],
-        capture_output=True,
-        text=True,
-        timeout=5.0,
-        encoding="utf-8",
-        errors="replace",
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
         env=None,
+        executable="/usr/bin/pip",
+        close_fds=False,
     )
-    mock_run.assert_any_call(
+    mock_popen.assert_any_call(
         ["pip", "install", "--help"],
-        capture_output=True,
-        text=True,
-        timeout=5.0,
-        encoding="utf-8",
-        errors="replace",
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
         env=None,
+        executable="/usr/bin/pip",
+        close_fds=False,
     )
+    responses[("pip", "--help")].communicate.assert_called_once_with(timeout=5.0)
@@ -55,6 +55,39 @@ subcommands:
     completions         Print instructions on enabling shell completions for pipx
 """
 
+# Definition lists under prose headings: no {a,b,c} group and no
+# "Commands:" heading anywhere, so only the def-list scan can find these.
+GIT = r"""
+usage: git [-v | --version] [-h | --help] [-C <path>] [-c <name>=<value>]
+           [--exec-path[=<path>]] [--html-path] [--man-path] [--info-path]
+           [-p | --paginate | -P | --no-pager] [--no-replace-objects] [--bare]
+           <command> [<args>]
+
+These are common Git commands used in various situations:
+
+start a working area (see also: git help tutorial)
+   clone     Clone a repository into a new directory
+   init      Create an empty Git repository or reinitialize an existing one
+
+work on the current change (see also: git help everyday)
+   add       Add file contents to the index
+   mv        Move or rename a file, a directory, or a symlink
+   restore   Restore working tree files
+   rm        Remove files from the working tree and from the index
+
+examine the history and state (see also: git help revisions)
+   bisect    Use binary search to find the commit that introduced a bug
+   diff      Show changes between commits, commit and working tree, etc
+   grep      Print lines matching a pattern
+   log       Show commit logs
+   show      Show various types of objects
+   status    Show the working tree status
+
+'git help -a' and 'git help -g' list available subcommands and some
+concept guides. See 'git help <command>' or 'git help <concept>'
+to read about a specific subcommand or concept.
+"""
+
 WRAPPED_ODD = r"""
 USAGE:
   oddtool [OPTIONS] <command>
@@ -84,7 +117,7 @@ def test_cli_tool_audit_commands():
     for cmd in expect:
         assert cmd in res.subcommands
     # Top few should be those:
-    assert res.subcommands[:4] == ["interactive", "freeze", "audit", "single"]
+    assert list(res.subcommands[:4]) == ["interactive", "freeze", "audit", "single"]
 
 
 def test_pipx_commands():
@@ -115,6 +148,26 @@ def test_pipx_commands():
         assert cmd in res.subcommands
 
 
+def test_git_definition_lists_without_commands_heading():
+    res = find_subcommands(GIT, root_command="git")
+    expect = [
+        "clone",
+        "init",
+        "add",
+        "mv",
+        "restore",
+        "rm",
+        "bisect",
+        "diff",
+        "grep",
+        "log",
+        "show",
+        "status",
+    ]
+    for cmd in expect:
+        assert cmd in res.subcommands
+
+
 def test_wrapped_definition_list_detection():
     res = find_subcommands(WRAPPED_ODD)
     assert "walk" in res.subcommands
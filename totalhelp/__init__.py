@@ -2,10 +2,15 @@ from __future__ import annotations
 
 from totalhelp.__main__ import print_output
 from totalhelp.external import full_help_external
-from totalhelp.library import add_totalhelp_flag, full_help_from_parser
+from totalhelp.library import (
+    add_totalhelp_flag,
+    full_help_from_parser,
+    full_help_from_parser_iter,
+)
 
 __all__ = [
     "full_help_from_parser",
+    "full_help_from_parser_iter",
     "add_totalhelp_flag",
     "print_output",
     "full_help_external",
@@ -11,8 +11,7 @@ from __future__ import annotations
 import argparse
 import os
 import sys
-import tempfile
-import webbrowser
+from typing import IO, Iterable, Optional, Union
 
 from rich_argparse import RichHelpFormatter
 
@@ -20,45 +19,96 @@ from totalhelp.__about__ import __version__
 from totalhelp.basic_types import FormatType
 from totalhelp.external import full_help_external
 
+# Resolved lazily in print_output: webbrowser drags in shlex/shutil/subprocess
+# at import time, and the common text-to-stdout path never needs it.
+webbrowser = None
+
 
 def print_output(
-    doc: str,
+    doc: Union[str, Iterable[str]],
     *,
     fmt: FormatType = "text",
     open_browser: bool = False,
-) -> None:
+    dest: Optional[IO[str]] = None,
+) -> Optional[str]:
     """
     Prints the help document or saves to a temp file and opens it.
 
     Args:
-        doc: The help document string.
+        doc: The help document, either as one string or as an iterable of
+            chunks (e.g. from `full_help_from_parser_iter`). Chunks are
+            streamed to the temp file without building the full string.
         fmt: The format of the document.
         open_browser: If True and format is "html", open in a browser.
+        dest: Optional writable text stream for HTML output. When given,
+            the document is written there (no temp file, no browser) --
+            handy for tests and web-framework callers.
+
+    Returns:
+        The destination's `name` when HTML was written to `dest`, else None.
     """
+    global webbrowser
+
     if fmt == "html":
+        if dest is not None:
+            if isinstance(doc, str):
+                dest.write(doc)
+            else:
+                for chunk in doc:
+                    dest.write(chunk)
+            return getattr(dest, "name", None)
+
+        import tempfile
+
         try:
             # Use delete=False to keep the file around after the handle is closed on Windows.
             with tempfile.NamedTemporaryFile(
                 mode="w", delete=False, suffix=".html", encoding="utf-8"
             ) as f:
-                f.write(doc)
+                if isinstance(doc, str):
+                    f.write(doc)
+                else:
+                    for chunk in doc:
+                        f.write(chunk)
                 filepath = f.name
 
             print(f"HTML help written to: file://{filepath}", file=sys.stderr)
 
             if open_browser:
+                if webbrowser is None:
+                    import webbrowser
                 try:
                     webbrowser.open(f"file://{os.path.realpath(filepath)}")
                 except webbrowser.Error as e:
                     print(f"Warning: Could not open web browser: {e}", file=sys.stderr)
         except Exception as e:
             print(f"Error writing temporary HTML file: {e}", file=sys.stderr)
-            # Fallback to printing to stdout
-            print(doc)
+            # Fallback to printing to stdout (doc may be a chunk iterable)
+            if isinstance(doc, str):
+                print(doc)
+            else:
+                sys.stdout.writelines(doc)
+                sys.stdout.write("\n")
     else:
         # For text and markdown, just print to stdout.
         # Rich handling is done in `full_help_from_parser`.
-        print(doc)
+        if isinstance(doc, str):
+            # One encode + one binary write beats print(), which pushes the
+            # document through the text-IO encoder in chunks under the
+            # stdout lock. Test harnesses may swap in a buffer-less stdout,
+            # so fall back to print() when .buffer is missing.
+            if hasattr(sys.stdout, "buffer"):
+                payload = doc.encode("utf-8", "replace")
+                sys.stdout.buffer.write(payload)
+                sys.stdout.buffer.write(b"\n")
+                sys.stdout.buffer.flush()
+            else:
+                print(doc)
+        else:
+            # Chunked documents are streamed so the full string never exists.
+            sys.stdout.writelines(doc)
+            sys.stdout.write("\n")
+    return None
 
 
 def main() -> None:
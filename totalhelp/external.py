@@ -1,12 +1,41 @@
 from __future__ import annotations
 
 import argparse
+import functools
+import os
+import shutil
 import subprocess  # nosec
-from typing import Callable, Dict, List, Mapping, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, FrozenSet, List, Optional, Tuple
 
 from totalhelp.basic_types import FormatType, _ParserNode
 from totalhelp.parser import find_subcommands
-from totalhelp.ui import _render_html, _render_md, _render_text
+from totalhelp.ui import _RENDERERS
+
+# Concurrent --help probes per BFS level. The per-child timeout is wall
+# clock, so over-subscribing the CPU (e.g. 32 children on a 1-vCPU CI
+# runner) starves each child until it "times out" despite being healthy;
+# keep the fan-out within what the machine can actually run.
+_MAX_PROBE_WORKERS = min(8, os.cpu_count() or 1)
+
+
+@functools.lru_cache(maxsize=128)
+def _which(cmd: str) -> Optional[str]:
+    """PATH lookup, cached: every subcommand of a tool shares one executable."""
+    return shutil.which(cmd)
+
+
+# Help output keyed by (command tuple, env items). Spawning `tool --help` is
+# milliseconds to seconds; re-introspecting the same CLI in one process (test
+# suites, dev loops) becomes a dict lookup. Only successful probes are
+# stored, so timeouts and launch failures stay retryable.
+_HelpCacheKey = Tuple[Tuple[str, ...], Optional[FrozenSet[Tuple[str, str]]]]
+_HELP_CACHE: Dict[_HelpCacheKey, str] = {}
+
+
+def clear_help_cache() -> None:
+    """Forget cached `--help` output (e.g. after the tool under inspection changed)."""
+    _HELP_CACHE.clear()
 
 
 def full_help_external(
@@ -45,40 +74,61 @@ def full_help_external(
         def format_help(self) -> str:
             return self._help_text
 
-    nodes: List[_ParserNode] = []
-    q: List[Tuple[Tuple[str, ...], List[str]]] = [((), command)]  # (path, full_command)
-    visited_paths = set()
-    prog = command[0]
-
-    while q:
-        path, cmd_list = q.pop(0)
-
-        if len(path) > max_depth:
-            continue
-
-        path_tuple = tuple(path)
-        if path_tuple in visited_paths:
-            continue
-        visited_paths.add(path_tuple)
+    # `is not None` rather than truthiness: env={} spawns children with an
+    # empty environment, which is not the same thing as inheriting ours.
+    env_key = frozenset(env.items()) if env is not None else None
 
+    def _fetch_help(cmd_list: List[str]) -> str:
         current_prog = " ".join(cmd_list)
+        cache_key = (tuple(cmd_list), env_key)
+        cached = _HELP_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
         try:
-            result = subprocess.run(  # nosec
+            # Popen directly instead of subprocess.run: run() layers its own
+            # timeout bookkeeping over the same Popen/communicate pair.
+            # Resolving the executable up front and passing close_fds=False
+            # lets CPython launch the child with posix_spawn instead of
+            # fork+exec, which skips copying the parent's page tables --
+            # noticeable when totalhelp runs inside a large host process.
+            # (A Linux/macOS win; Windows always uses CreateProcess.)
+            # Capture raw bytes and decode once: text=True would wrap each
+            # pipe in an incremental decoder, which is slower for one blob.
+            proc = subprocess.Popen(  # nosec
                 cmd_list + ["--help"],
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-                encoding="utf-8",
-                errors="replace",
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
                 env=env,
+                executable=_which(cmd_list[0]),
+                close_fds=False,
             )
-            # Combine stdout and stderr as some tools print help to stderr
-            help_text = result.stdout + result.stderr
-            if result.returncode != 0:
+            try:
+                out, err = proc.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                # Same cleanup subprocess.run does: kill and drain the pipes
+                # so the child doesn't linger.
+                proc.kill()
+                proc.communicate()
+                raise
+            # Combine stdout and stderr as some tools print help to stderr;
+            # stderr is usually empty, so skip the concat (and its copy of
+            # the whole help blob) in that common case.
+            if err:
+                help_text = (out + err).decode("utf-8", "replace")
+            else:
+                help_text = out.decode("utf-8", "replace")
+            if proc.returncode != 0:
                 help_text = (
-                    f"[Warning: command exited with code {result.returncode}]\n\n"
+                    f"[Warning: command exited with code {proc.returncode}]\n\n"
                     + help_text
                 )
+            else:
+                # Only clean exits are memoized: caching a timeout or launch
+                # error would poison every later call in this process, with
+                # no way for a retry to recover. Racing threads may both
+                # miss and both run the command; last write wins, which is
+                # harmless since the output is the same.
+                _HELP_CACHE[cache_key] = help_text
 
         except FileNotFoundError:
             help_text = f"[Error: command not found: '{current_prog}']"
@@ -86,21 +136,36 @@ def full_help_external(
             help_text = f"[Error: command timed out after {timeout} seconds]"
         except Exception as e:
             help_text = f"[Error: an unexpected error occurred: {e}]"
+        return help_text
 
-        parser = _HelpOnlyParser(help_text.strip(), prog=current_prog)
-        nodes.append(_ParserNode(path=path_tuple, parser=parser))
+    nodes: List[_ParserNode] = []
+    visited_paths = {()}
+    prog = command[0]
 
-        # Discover subcommands and add them to the queue
-        subcommands = find_subcommands(help_text, root_command=cmd_list[-1])
-        for sub_cmd in subcommands.subcommands:
-            new_path = path_tuple + (sub_cmd,)
-            if new_path not in visited_paths:
-                q.append((new_path, command + list(new_path)))
+    # Level-synchronous BFS: each subprocess call blocks on an external
+    # process, so fan out every command at the current depth across a thread
+    # pool. `ex.map` preserves input order, keeping output deterministic.
+    # One executor serves every level: its threads are spawned lazily on
+    # demand, and reusing it avoids tearing down and restarting the pool
+    # at each depth.
+    level: List[Tuple[Tuple[str, ...], List[str]]] = [((), command)]
+    with ThreadPoolExecutor(max_workers=_MAX_PROBE_WORKERS) as ex:
+        while level:
+            helps = list(ex.map(lambda pc: _fetch_help(pc[1]), level))
+
+            next_level: List[Tuple[Tuple[str, ...], List[str]]] = []
+            for (path, cmd_list), help_text in zip(level, helps):
+                parser = _HelpOnlyParser(help_text.strip(), prog=" ".join(cmd_list))
+                nodes.append(_ParserNode(path=path, parser=parser))
+
+                # Discover subcommands and queue them for the next level
+                subcommands = find_subcommands(help_text, root_command=cmd_list[-1])
+                for sub_cmd in subcommands.subcommands:
+                    new_path = path + (sub_cmd,)
+                    if new_path not in visited_paths and len(new_path) <= max_depth:
+                        visited_paths.add(new_path)
+                        next_level.append((new_path, command + list(new_path)))
+            level = next_level
 
     # Now render the collected nodes
-    renderers: Mapping[FormatType, Callable] = {
-        "text": _render_text,
-        "md": _render_md,
-        "html": _render_html,
-    }
-    return renderers[fmt](nodes, prog)
+    return _RENDERERS[fmt](nodes, prog)
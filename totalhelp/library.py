@@ -3,24 +3,41 @@
 from __future__ import annotations
 
 import argparse
-import io
 import sys
-from typing import Callable, Iterable, Mapping, Optional
+from collections import deque
+from typing import Iterable, Optional
 
 from totalhelp.basic_types import FormatType, _ParserNode
-from totalhelp.ui import _render_html, _render_md, _render_text
-
-# Try to import rich for optional enhancements.
-try:
-    import rich
-    import rich.console
-    import rich.markdown
-
-    # from rich_argparse import RichHelpFormatter
-
-    _RICH_AVAILABLE = True
-except ImportError:
-    _RICH_AVAILABLE = False
+from totalhelp.ui import (
+    _RENDERERS,
+    _help_strings,
+    _md_fragments,
+    _path_strings,
+    _render_html_iter,
+    _text_fragments,
+)
+
+# Local binding so the walk does an exact type check instead of an
+# isinstance/MRO walk per action. Custom _SubParsersAction subclasses must
+# set a class attribute `_TOTALHELP_SUBPARSER = True` to be discovered.
+_SP = argparse._SubParsersAction
+
+# Concrete action types that can never hold subparsers. Most actions on a
+# real-world parser are plain stores/flags, so the walk drops them with one
+# frozenset membership test instead of probing each for subparser traits.
+_BORING_ACTIONS = frozenset(
+    {
+        argparse._StoreAction,
+        argparse._StoreConstAction,
+        argparse._StoreTrueAction,
+        argparse._StoreFalseAction,
+        argparse._AppendAction,
+        argparse._AppendConstAction,
+        argparse._CountAction,
+        argparse._HelpAction,
+        argparse._VersionAction,
+    }
+)
 
 
 def add_totalhelp_flag(
@@ -73,10 +90,15 @@ def _walk_parser_tree(
     """
     Recursively walk the parser and its subparsers.
 
-    Yields a `_ParserNode` for each parser found in the tree.
+    Yields a `_ParserNode` for each parser found in the tree. The traversal
+    is memoized on the root parser, so re-rendering the same tree (e.g. in
+    several formats) reuses the first walk. Call `_invalidate_walk_cache`
+    if subparsers are added after the first render.
     """
-    q: list[_ParserNode] = [_ParserNode(path=(), parser=root_parser)]
-    visited_parsers = {id(root_parser)}
+    cached = getattr(root_parser, "_totalhelp_walk_cache", None)
+    if cached is not None:
+        yield from cached
+        return
 
     # Override the program name at the root if specified.
     # This is tricky because `prog` is used to build help messages.
@@ -86,22 +108,84 @@ def _walk_parser_tree(
         root_parser.prog = prog
 
     try:
-        while q:
-            node = q.pop(0)
-            yield node
-
-            for action in node.parser._actions:
-                # _SubParsersAction holds the mapping from command name to subparser
-                if isinstance(action, argparse._SubParsersAction):
-                    for name, subparser in action.choices.items():
-                        if id(subparser) not in visited_parsers:
-                            new_path = node.path + (name,)
-                            q.append(_ParserNode(path=new_path, parser=subparser))
-                            visited_parsers.add(id(subparser))
+        nodes = tuple(_walk_impl(root_parser))
     finally:
         # Restore the original program name to avoid side effects.
         root_parser.prog = original_prog
 
+    # Only attach the cache to real parsers, not arbitrary duck-typed objects.
+    if isinstance(root_parser, argparse.ArgumentParser):
+        root_parser._totalhelp_walk_cache = nodes
+    yield from nodes
+
+
+def _invalidate_walk_cache(parser: argparse.ArgumentParser) -> None:
+    """Drop a memoized traversal after the parser tree has been mutated."""
+    if hasattr(parser, "_totalhelp_walk_cache"):
+        del parser._totalhelp_walk_cache
+
+
+def _walk_impl(root_parser: argparse.ArgumentParser) -> Iterable[_ParserNode]:
+    """Breadth-first traversal of a parser and its subparsers."""
+    q: deque[_ParserNode] = deque([_ParserNode(path=(), parser=root_parser)])
+
+    while q:
+        node = q.popleft()
+        yield node
+
+        for action in node.parser._actions:
+            if type(action) in _BORING_ACTIONS:
+                continue
+            # _SubParsersAction holds the mapping from command name to subparser
+            if type(action) is _SP or getattr(action, "_TOTALHELP_SUBPARSER", False):
+                # Subparsers form a tree, so no global visited set is needed;
+                # the one real sharing case is aliases within a single
+                # action (several choice names mapping to one parser), which
+                # this small local set collapses to the first name.
+                seen_here: set[int] = set()
+                for name, subparser in action.choices.items():
+                    sid = id(subparser)
+                    if sid in seen_here:
+                        continue
+                    seen_here.add(sid)
+                    # Shared prefixes ("remote" in `remote add` and
+                    # `remote remove`) appear in every descendant path;
+                    # interning stores each name once.
+                    new_path = node.path + (sys.intern(name),)
+                    q.append(_ParserNode(path=new_path, parser=subparser))
+
+
+def full_help_from_parser_iter(
+    parser: argparse.ArgumentParser,
+    prog: Optional[str] = None,
+    fmt: FormatType = "html",
+    *,
+    width: Optional[int] = None,
+) -> Iterable[str]:
+    """
+    Like `full_help_from_parser`, but returns the document in chunks.
+
+    The header, each command's section, and the footer are yielded as
+    separate pieces for every format, so large documents can be streamed
+    to a file or terminal without materializing the whole string.
+
+    A plain function rather than a generator so a bad `fmt` raises here,
+    at call time, instead of on the first `next()`.
+    """
+    if fmt not in _RENDERERS:
+        raise ValueError(
+            f"Invalid format '{fmt}'. Must be one of {list(_RENDERERS.keys())}"
+        )
+
+    program_name = prog or parser.prog or ""
+    nodes = list(_walk_parser_tree(parser, prog=program_name))
+
+    if fmt == "html":
+        return _render_html_iter(nodes, program_name, width=width)
+    if fmt == "md":
+        return iter(_md_fragments(nodes, program_name, width=width))
+    return iter(_text_fragments(nodes, program_name, width=width))
+
 
 def full_help_from_parser(
     parser: argparse.ArgumentParser,
@@ -110,6 +194,7 @@ def full_help_from_parser(
     *,
     use_rich: Optional[bool] = True,
     width: Optional[int] = None,
+    dedupe: bool = False,
 ) -> str:
     """
     Traverses a parser and all nested subparsers to produce a single help document.
@@ -118,44 +203,49 @@ def full_help_from_parser(
         parser: The root `ArgumentParser` instance.
         prog: Override the program name shown at the root (defaults to `parser.prog`).
         fmt: The output format ("text", "md", or "html").
-        use_rich: If True, and `rich` is installed, use it for terminal output.
-              If None, auto-detects based on TTY and `rich` availability.
-        width: Optional wrapping width for plain text mode. Not yet implemented.
+        use_rich: Accepted for backward compatibility and ignored. The old
+              rich re-render only printed to the console as a side effect
+              (its output was never returned) and has been removed.
+        width: Optional fixed wrapping width; when set, each parser is
+              formatted at that width instead of probing the terminal size.
+        dedupe: If True, skip subparsers whose rendered help is identical
+              to one already emitted, producing a more compact document.
 
     Returns:
         A string containing the complete help document.
     """
-    if use_rich is None:
-        use_rich = _RICH_AVAILABLE and sys.stdout.isatty()
-
     program_name = prog or parser.prog or ""
     nodes = list(_walk_parser_tree(parser, prog=program_name))
 
-    renderers: Mapping[FormatType, Callable] = {
-        "text": _render_text,
-        "md": _render_md,
-        "html": _render_html,
-    }
-
-    if fmt not in renderers:
+    # Format every parser once up front; dedupe and all renderers share
+    # these strings.
+    helps = _help_strings(nodes, width)
+
+    if dedupe:
+        # Keyed on the strings themselves: the set's first probe is the
+        # cached string hash anyway, and (unlike bare hashes) a collision
+        # cannot silently drop a distinct command's section.
+        seen: set[str] = set()
+        unique_nodes = []
+        unique_helps = []
+        for node, node_help in zip(nodes, helps):
+            if node_help in seen:
+                continue
+            seen.add(node_help)
+            unique_nodes.append(node)
+            unique_helps.append(node_help)
+        nodes = unique_nodes
+        helps = unique_helps
+
+    if fmt not in _RENDERERS:
         raise ValueError(
-            f"Invalid format '{fmt}'. Must be one of {list(renderers.keys())}"
+            f"Invalid format '{fmt}'. Must be one of {list(_RENDERERS.keys())}"
         )
 
-    doc = renderers[fmt](nodes, program_name)
-
-    # If rich is requested for text format, re-render the doc through rich.
-    if fmt == "text" and use_rich and _RICH_AVAILABLE:
-        # Use rich to print, which gives us color and better wrapping.
-        # This is a bit of a trick: we render to Markdown internally and then
-        # have rich render that Markdown to the console. This gives nice headings.
-        md_doc = _render_md(nodes, program_name)
-        console = rich.console.Console()
-        io.StringIO()
-        console.print(
-            rich.markdown.Markdown(md_doc),
-            # file=s
-        )
-        # return s.getvalue()
+    # Display paths are computed once (after dedupe) so the renderers
+    # never rebuild them per node.
+    path_strs = _path_strings(nodes, program_name)
 
-    return doc
+    return _RENDERERS[fmt](
+        nodes, program_name, width=width, helps=helps, path_strs=path_strs
+    )
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import functools
 from dataclasses import dataclass, field
 from typing import Dict, Iterable, List, Optional, Tuple
 
@@ -10,6 +11,19 @@ _ALLOWED_CHARS = set(
 )
 _FORBIDDEN_TRAIL = set(").,:;!?]}'\"")  # if token ends with one of these -> reject
 
+# Shared token/section vocabularies, built once instead of per call.
+_META_TOKENS = frozenset(
+    {"command", "<command>", "subcommand", "<subcommand>", "module", "<module>"}
+)
+_WANTED_SECTIONS = frozenset(
+    {"subcommands", "commands", "available commands", "positional arguments"}
+)
+_WANTED_UNCONDITIONAL = frozenset({"subcommands", "commands", "available commands"})
+_WANTED_POSITIONAL = frozenset({"positional arguments"})
+_DENY_TOKENS = frozenset(
+    {"examples", "options", "usage", "help", "version", "get", "from"}
+)
+
 
 def _looks_like_shell_echo(line: str) -> bool:
     s = line.lstrip()
@@ -126,9 +140,6 @@ def extract_from_named_sections_with_baseline(sections: list[Section]) -> list[s
     Accept commands from 'Subcommands'/'Commands' unconditionally (with indent baseline),
     but only accept from 'positional arguments' if the section contains a {a,b,c} list.
     """
-    wanted_unconditional = {"subcommands", "commands", "available commands"}
-    wanted_positional = {"positional arguments"}
-
     out: list[str] = []
 
     def parse_section(sec: Section) -> list[str]:
@@ -145,18 +156,18 @@ def extract_from_named_sections_with_baseline(sections: list[Section]) -> list[s
     for sec in sections:
         title = sec.title.strip().lower()
 
-        if title in wanted_unconditional:
+        if title in _WANTED_UNCONDITIONAL:
             for tok in parse_section(sec):
                 if tok not in out:
                     out.append(tok)
             # also accept brace choices here
-            collapsed = " ".join(p.strip() for p in sec.lines if p.strip())
+            collapsed = " ".join([p.strip() for p in sec.lines if p.strip()])
             for choice in _brace_choices(_strip_square_groups(collapsed)):
                 if _token_is_reasonable_command(choice) and choice not in out:
                     out.append(choice)
 
-        elif title in wanted_positional:
-            collapsed = " ".join(p.strip() for p in sec.lines if p.strip())
+        elif title in _WANTED_POSITIONAL:
+            collapsed = " ".join([p.strip() for p in sec.lines if p.strip()])
             choices = _brace_choices(_strip_square_groups(collapsed))
             if choices:
                 # Only in the brace-list case do we treat them as subcommands
@@ -227,8 +238,7 @@ def _token_is_optionish(tok: str) -> bool:
     if tok.startswith("-"):  # -h, --help
         return True
     # Common placeholders or meta names that aren't subcommands:
-    meta = {"command", "<command>", "subcommand", "<subcommand>", "module", "<module>"}
-    return tok.lower() in meta
+    return tok.lower() in _META_TOKENS
 
 
 def _first_word_if_defitem(line: str) -> Optional[str]:
@@ -270,16 +280,45 @@ def _strip_square_groups(s: str) -> str:
     """
     Remove [...] groups from a string (non-nested is fine; nested behaves reasonably).
     Useful before scanning for {a,b,c}.
+
+    Scans with `str.find` and copies whole slices between brackets, so the
+    per-character work happens in C; stray ']' at depth 0 is dropped and an
+    unbalanced '[' swallows the rest of the string, matching the old
+    character-by-character loop.
     """
-    out = []
-    depth = 0
-    for ch in s:
-        if ch == "[":
-            depth += 1
-        elif ch == "]":
-            depth = max(0, depth - 1)
-        elif depth == 0:
-            out.append(ch)
+    if "[" not in s and "]" not in s:
+        return s
+    out: List[str] = []
+    pos = 0
+    n = len(s)
+    while pos < n:
+        lb = s.find("[", pos)
+        rb = s.find("]", pos)
+        if lb == -1 and rb == -1:
+            out.append(s[pos:])
+            break
+        if rb != -1 and (lb == -1 or rb < lb):
+            # stray ']' at depth 0: keep the text before it, drop the bracket
+            out.append(s[pos:rb])
+            pos = rb + 1
+            continue
+        # '[' comes next: keep the text before it, then skip the whole
+        # (possibly nested) group
+        out.append(s[pos:lb])
+        depth = 1
+        pos = lb + 1
+        while depth:
+            nxt_rb = s.find("]", pos)
+            if nxt_rb == -1:
+                # unbalanced '[': everything that follows is inside the group
+                return "".join(out)
+            nxt_lb = s.find("[", pos)
+            if nxt_lb != -1 and nxt_lb < nxt_rb:
+                depth += 1
+                pos = nxt_lb + 1
+            else:
+                depth -= 1
+                pos = nxt_rb + 1
     return "".join(out)
 
 
@@ -321,66 +360,54 @@ class Section:
     lines: List[str] = field(default_factory=list)
 
 
-def _sectionize(text: str) -> Tuple[Optional[List[str]], List[Section]]:
+def _sectionize(lines: List[str]) -> Tuple[Optional[List[str]], List[Section]]:
     """
-    Split help text into:
+    Split pre-split help lines into:
       - a 'usage block' (list of lines) if present
       - a list of sections detected by headings (e.g. 'Subcommands:', 'Options:', etc.)
     A section runs until the next heading or EOF.
     """
-    lines = _lines(text)
-    lines = _rstrip_lines(lines)
-
-    usage_block: Optional[List[str]] = None
+    # Single pass: the usage-block tracker and the heading tracker run
+    # side by side over each line (they are independent -- a usage line can
+    # legitimately sit inside a section body), replacing the previous two
+    # sequential walks over the line list.
+    usage_buf: Optional[List[str]] = None
+    in_usage = False
+    usage_done = False
     sections: List[Section] = []
-
-    i = 0
-    # 1) usage block: contiguous lines starting with 'usage:' and its wrapped lines
-    while i < len(lines):
-        if _starts_with_usage(lines[i]):
-            buf = [lines[i]]
-            i += 1
-            # collect wrapped lines until blank-blank or a clear section heading
-            while i < len(lines):
-                ln = lines[i]
-                if _is_blank(ln):
-                    # keep a single blank in usage, but stop if double-blank
-                    buf.append(ln)
-                    # check ahead
-                    if i + 1 < len(lines) and _is_blank(lines[i + 1]):
-                        break
-                    i += 1
-                    continue
-                if _is_heading(ln):
-                    break
+    current: Optional[Section] = None
+
+    n = len(lines)
+    for i, ln in enumerate(lines):
+        # 1) usage block: contiguous lines starting with 'usage:' and its
+        # wrapped (indented) lines, ending at a double blank, a heading, or
+        # a non-indented line. Only the first such block is collected.
+        if in_usage:
+            if _is_blank(ln):
+                # keep a single blank in usage, but stop if double-blank
+                usage_buf.append(ln)  # type: ignore[union-attr]
+                if i + 1 < n and _is_blank(lines[i + 1]):
+                    in_usage = False
+                    usage_done = True
+            elif _is_heading(ln) or _leading_spaces(ln) == 0:
+                # non-indented, non-blank likely ends usage
+                in_usage = False
+                usage_done = True
+            else:
                 # usage often wraps with leading spaces
-                if _leading_spaces(ln) > 0:
-                    buf.append(ln)
-                    i += 1
-                    continue
-                # non-indented, non-heading, non-blank likely ends usage
-                break
-            usage_block = buf
-            # do NOT return; more content follows; fall through for sections
-            break
-        i += 1
-
-    # 2) sections by headings
-    j = 0
-    while j < len(lines):
-        if _is_heading(lines[j]):
-            title = lines[j].strip()[:-1]  # strip trailing ':'
-            k = j + 1
-            body: List[str] = []
-            while k < len(lines) and not _is_heading(lines[k]):
-                body.append(lines[k])
-                k += 1
-            sections.append(Section(title=title, lines=body))
-            j = k
-        else:
-            j += 1
+                usage_buf.append(ln)  # type: ignore[union-attr]
+        elif not usage_done and _starts_with_usage(ln):
+            usage_buf = [ln]
+            in_usage = True
 
-    return usage_block, sections
+        # 2) sections by headings: a section runs until the next heading.
+        if _is_heading(ln):
+            current = Section(title=ln.strip()[:-1])  # strip trailing ':'
+            sections.append(current)
+        elif current is not None:
+            current.lines.append(ln)
+
+    return usage_buf, sections
 
 
 # ---------------------------
@@ -395,7 +422,7 @@ def extract_from_usage(usage_lines: Optional[List[str]]) -> List[str]:
     if not usage_lines:
         return []
     # collapse to one line for ease, but keep content
-    single = " ".join(ln.strip() for ln in usage_lines if ln.strip())
+    single = " ".join([ln.strip() for ln in usage_lines if ln.strip()])
     # drop [...] groups to avoid optional-choices noise
     single = _strip_square_groups(single)
     return _brace_choices(single)
@@ -406,42 +433,41 @@ def extract_from_named_sections(sections: List[Section]) -> List[str]:
     Strategy B: From sections named like 'Subcommands', 'Commands', 'Positional arguments'
     we parse definition-list styled items. We don't trust words inside braces here.
     """
-    wanted = {"subcommands", "commands", "available commands", "positional arguments"}
     out: List[str] = []
     for sec in sections:
-        if sec.title.strip().lower() in wanted:
+        if sec.title.strip().lower() in _WANTED_SECTIONS:
             for ln in sec.lines:
                 tok = _first_word_if_defitem(ln)
                 if tok and tok not in out:
                     out.append(tok)
             # also try light-weight scan for brace choices inside the section
-            collapsed = " ".join(p.strip() for p in sec.lines if p.strip())
+            collapsed = " ".join([p.strip() for p in sec.lines if p.strip()])
             for choice in _brace_choices(_strip_square_groups(collapsed)):
                 if choice not in out:
                     out.append(choice)
     return out
 
 
-def extract_from_all_definition_lists(text: str) -> List[str]:
+def extract_from_all_definition_lists(lines: List[str]) -> List[str]:
     """
     Strategy C: Scan *all* lines and collect tokens that look like left-column 'terms'
     in definition lists. This often finds commands even when sections are oddly named.
     """
     out: List[str] = []
-    for ln in _lines(text):
+    for ln in lines:
         tok = _first_word_if_defitem(ln)
         if tok and tok not in out:
             out.append(tok)
     return out
 
 
-def extract_frequency_candidates(text: str) -> List[str]:
+def extract_frequency_candidates(lines: List[str]) -> List[str]:
     """
     Strategy D (weak but helpful): collect first words of many indented lines and
     score by frequency, filtering optionish. Useful for weird/non-argparse helps.
     """
     counts: Dict[str, int] = {}
-    for ln in _lines(text):
+    for ln in lines:
         if _leading_spaces(ln) == 0:
             continue
         # first word
@@ -462,21 +488,34 @@ def extract_frequency_candidates(text: str) -> List[str]:
 # ---------------------------
 
 
-@dataclass
+@dataclass(frozen=True)
 class ParseResult:
-    subcommands: List[str]
-    evidence: Dict[str, List[str]] = field(default_factory=dict)
+    subcommands: Tuple[str, ...]
+    evidence: Dict[str, Tuple[str, ...]] = field(default_factory=dict)
 
 
+@functools.lru_cache(maxsize=512)
 def find_subcommands(help_text: str, root_command: Optional[str] = None) -> ParseResult:
     """
     Try multiple strategies, score + merge, then filter.
+
+    Results are cached on the raw help string (and root command); the same
+    `--help` blob is often re-parsed across formats and invocations, so repeat
+    calls become a dict lookup. Use `find_subcommands.cache_clear()` to reset.
+    The result is frozen (tuples) so a cached value can be safely shared.
     """
-    usage_block, sections = _sectionize(help_text)
+    # No quick reject here: Strategy C scans bare definition lists, so help
+    # text without a {a,b,c} choice group or a "commands:"-style heading can
+    # still yield subcommands (git --help is the canonical example). The
+    # lru_cache above is what keeps repeat parses cheap.
+
+    # Normalize and split once; every strategy consumes the same line list.
+    lines = _rstrip_lines(_lines(help_text))
+    usage_block, sections = _sectionize(lines)
 
     a = extract_from_usage(usage_block)  # Strategy A
     b = extract_from_named_sections(sections)  # Strategy B
-    c = extract_from_all_definition_lists(help_text)  # Strategy C
+    c = extract_from_all_definition_lists(lines)  # Strategy C
 
     # Score/merge: A and B are higher-confidence than C, which is higher than D.
     weights = {id_: w for id_, w in zip("ABC", (3, 3, 2))}
@@ -494,10 +533,9 @@ def find_subcommands(help_text: str, root_command: Optional[str] = None) -> Pars
     add_all(c, weights["C"])
 
     # Filter: remove very-likely-non-command tokens that slipped in
-    deny = {"examples", "options", "usage", "help", "version", "get", "from"}
     filtered = []
     for t in order:
-        if t.lower() in deny:
+        if t.lower() in _DENY_TOKENS:
             continue
         if _token_is_optionish(t):
             continue
@@ -511,10 +549,10 @@ def find_subcommands(help_text: str, root_command: Optional[str] = None) -> Pars
     filtered.sort(key=lambda t: (-score[t], order.index(t)))
 
     return ParseResult(
-        subcommands=filtered,
+        subcommands=tuple(filtered),
         evidence={
-            "usage_choices": a,
-            "named_sections": b,
-            "deflists": c,
+            "usage_choices": tuple(a),
+            "named_sections": tuple(b),
+            "deflists": tuple(c),
         },
     )
@@ -1,117 +1,298 @@
 from __future__ import annotations
 
 import argparse
+import html
 import io
+import shutil
 import textwrap
-from typing import IO, List, Optional
+from typing import IO, Callable, List, Mapping, Optional
 
-from totalhelp.basic_types import _ParserNode
+from totalhelp.basic_types import FormatType, _ParserNode
 
+# Built once; rebuilding "\n" + "-" * 78 + "\n" per node is pure allocator churn.
+_TEXT_SEPARATOR = "\n" + "-" * 78 + "\n"
 
-def _get_help_string(
-    parser: argparse.ArgumentParser, file: Optional[IO[str]] = None
+# Markdown heading markers indexed by heading level (1-based).
+_MD_HEADINGS = ("", "#", "##", "###", "####", "#####", "######")
+
+# Minimal, clean CSS for readability. Dedented once at import: the template
+# is static, so there is no reason to rescan it on every render.
+_CSS = textwrap.dedent("""
+    body { font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Helvetica, Arial, sans-serif; line-height: 1.6; margin: 0; background-color: #f8f9fa; color: #212529; }
+    .container { max-width: 800px; margin: 2rem auto; padding: 2rem; background-color: #fff; border-radius: 8px; box-shadow: 0 4px 8px rgba(0,0,0,0.05); }
+    h1, h2, h3 { margin-top: 2rem; margin-bottom: 1rem; color: #343a40; border-bottom: 1px solid #dee2e6; padding-bottom: 0.5rem; }
+    h1 { font-size: 2.5rem; }
+    h2 { font-size: 2rem; }
+    h3 { font-size: 1.75rem; }
+    pre { background-color: #e9ecef; padding: 1rem; border-radius: 5px; white-space: pre-wrap; word-wrap: break-word; font-family: "SFMono-Regular", Consolas, "Liberation Mono", Menlo, Courier, monospace; }
+    code { font-family: "SFMono-Regular", Consolas, "Liberation Mono", Menlo, Courier, monospace; font-size: 0.9em; color: #d6336c; }
+    .command { font-weight: bold; }
+    nav { padding: 1rem; background: #343a40; color: white; margin-bottom: 2rem; border-radius: 8px 8px 0 0; }
+    nav h1 { border: none; margin: 0; }
+    nav ul { list-style: none; padding: 0; margin: 0; }
+    nav li { display: inline-block; margin-right: 1rem; }
+    nav a { color: #adb5bd; text-decoration: none; }
+    nav a:hover { color: white; }
+""")
+
+
+def _format_parser_help(
+    parser: argparse.ArgumentParser, width: Optional[int] = None
 ) -> str:
-    """Capture help output from a parser instance."""
-    io.StringIO()
-    # Note: argparse.ArgumentParser.print_help writes directly to a file-like object.
-    # The `format_help` method returns the string directly. We prefer it.
-    return parser.format_help()
+    """Format a parser's help, optionally at a fixed wrapping width.
+
+    Equivalent to `parser.format_help()`, but builds the `HelpFormatter`
+    directly so a precomputed `width` can be passed in -- skipping the
+    per-parser terminal-size probe when rendering many subparsers.
+    Parsers that override `format_help` (e.g. the help-only shims built
+    for external commands) keep their own behavior.
+    """
+    if type(parser).format_help is not argparse.ArgumentParser.format_help:
+        return parser.format_help()
+
+    if width is None:
+        formatter = parser._get_formatter()
+    else:
+        try:
+            formatter = parser.formatter_class(prog=parser.prog, width=width)
+        except TypeError:
+            # formatter_class is often a lambda or subclass taking only
+            # `prog` (e.g. lambda prog: HelpFormatter(prog, max_help_position=40));
+            # the shared width is a best-effort optimization, so fall back to
+            # the stock constructor (and its own terminal probe) rather than
+            # turning such parsers into a crash.
+            formatter = parser._get_formatter()
+    formatter.add_usage(
+        parser.usage, parser._actions, parser._mutually_exclusive_groups
+    )
+    formatter.add_text(parser.description)
+    for action_group in parser._action_groups:
+        formatter.start_section(action_group.title)
+        formatter.add_text(action_group.description)
+        formatter.add_arguments(action_group._group_actions)
+        formatter.end_section()
+    formatter.add_text(parser.epilog)
+    return formatter.format_help()
+
+
+def _help_strings(nodes: List[_ParserNode], width: Optional[int] = None) -> List[str]:
+    """Format every node's help once; renderers share the result."""
+    if width is None:
+        # HelpFormatter probes the terminal size (a syscall) in its
+        # constructor when no width is given; probe once here and hand every
+        # node the same number. Matches HelpFormatter's own default.
+        width = shutil.get_terminal_size().columns - 2
+    return [_format_parser_help(n.parser, width=width).strip() for n in nodes]
+
+
+def _path_strings(nodes: List[_ParserNode], prog: str) -> List[str]:
+    """Display path ("prog sub subsub") per node, computed once and shared."""
+    prog_prefix = prog + " "
+    return [prog_prefix + " ".join(n.path) if n.path else prog for n in nodes]
+
 
+def _node_anchors(nodes: List[_ParserNode]) -> List[str]:
+    """HTML anchor id per node, shared by the TOC and body loops."""
+    return ["cmd-" + "-".join(n.path) if n.path else "cmd-root" for n in nodes]
 
-def _render_text(nodes: List[_ParserNode], prog: str) -> str:
+
+def _text_fragments(
+    nodes: List[_ParserNode],
+    prog: str,
+    width: Optional[int] = None,
+    helps: Optional[List[str]] = None,
+    path_strs: Optional[List[str]] = None,
+) -> List[str]:
+    """Build the plain-text document as a flat fragment list.
+
+    Shared by `_render_text` (joins it) and `_render_text_to` (writes each
+    fragment straight to a stream, never materializing the whole document).
+    """
+    if helps is None:
+        helps = _help_strings(nodes, width)
+    if path_strs is None:
+        path_strs = _path_strings(nodes, prog)
+    n = len(nodes)
+    if n == 0:
+        return []
+    node_sep = "\n" + _TEXT_SEPARATOR + "\n"
+    # Exactly 5 fragments per node plus a separator after all but the last;
+    # sizing the list up front skips the append-growth reallocations.
+    parts: List[str] = [node_sep] * (6 * n - 1)
+    idx = 0
+    for i in range(n):
+        title = f"$ {path_strs[i]} --help"
+        parts[idx] = title
+        parts[idx + 1] = "\n"
+        parts[idx + 2] = "=" * len(title)
+        parts[idx + 3] = "\n"
+        parts[idx + 4] = helps[i]
+        idx += 6  # slot idx+5 keeps the prefilled separator
+    return parts
+
+
+def _render_text(
+    nodes: List[_ParserNode],
+    prog: str,
+    width: Optional[int] = None,
+    helps: Optional[List[str]] = None,
+    path_strs: Optional[List[str]] = None,
+) -> str:
     """Render the collected help nodes as plain text."""
-    output: List[str] = []
+    return "".join(_text_fragments(nodes, prog, width, helps, path_strs))
+
+
+def _render_text_to(
+    nodes: List[_ParserNode],
+    prog: str,
+    out: IO[str],
+    width: Optional[int] = None,
+    helps: Optional[List[str]] = None,
+    path_strs: Optional[List[str]] = None,
+) -> None:
+    """Write the plain-text document to `out` without joining it first."""
+    out.writelines(_text_fragments(nodes, prog, width, helps, path_strs))
+
+
+def _md_fragments(
+    nodes: List[_ParserNode],
+    prog: str,
+    width: Optional[int] = None,
+    helps: Optional[List[str]] = None,
+    path_strs: Optional[List[str]] = None,
+) -> List[str]:
+    """Build the Markdown document as a flat fragment list."""
+    if helps is None:
+        helps = _help_strings(nodes, width)
+    if path_strs is None:
+        path_strs = _path_strings(nodes, prog)
+    # One title fragment plus exactly 3 per node; presized like _text_fragments.
+    parts: List[str] = [""] * (3 * len(nodes) + 1)
+    parts[0] = f"# Help for `{prog}`\n"
+    idx = 1
     for i, node in enumerate(nodes):
-        path_str = " ".join((prog,) + node.path)
-        title = f"$ {path_str} --help"
-        output.append(title)
-        output.append("=" * len(title))
-        output.append(_get_help_string(node.parser).strip())
-        if i < len(nodes) - 1:
-            output.append("\n" + "-" * 78 + "\n")
-    return "\n".join(output)
+        level = len(node.path) + 2  # ## for top-level, ### for next, etc.
+        heading = _MD_HEADINGS[level] if level < len(_MD_HEADINGS) else "#" * level
+        parts[idx] = f"\n{heading} `{path_strs[i]}`\n\n```text\n"
+        parts[idx + 1] = helps[i]
+        parts[idx + 2] = "\n```\n"
+        idx += 3
+    return parts
 
 
-def _render_md(nodes: List[_ParserNode], prog: str) -> str:
+def _render_md(
+    nodes: List[_ParserNode],
+    prog: str,
+    width: Optional[int] = None,
+    helps: Optional[List[str]] = None,
+    path_strs: Optional[List[str]] = None,
+) -> str:
     """Render the collected help nodes as Markdown."""
-    output: List[str] = [f"# Help for `{prog}`\n"]
-    for node in nodes:
-        path_str = " ".join((prog,) + node.path)
-        level = len(node.path) + 2  # ## for top-level, ### for next, etc.
-        heading = "#" * level
-        output.append(f"{heading} `{path_str}`\n")
-        output.append("```text")
-        output.append(_get_help_string(node.parser).strip())
-        output.append("```\n")
-    return "\n".join(output)
+    return "".join(_md_fragments(nodes, prog, width, helps, path_strs))
 
 
-def _render_html(nodes: List[_ParserNode], prog: str) -> str:
-    """Render the collected help nodes as a self-contained HTML file."""
-    # Minimal, clean CSS for readability.
-    css = textwrap.dedent("""
-        body { font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Helvetica, Arial, sans-serif; line-height: 1.6; margin: 0; background-color: #f8f9fa; color: #212529; }
-        .container { max-width: 800px; margin: 2rem auto; padding: 2rem; background-color: #fff; border-radius: 8px; box-shadow: 0 4px 8px rgba(0,0,0,0.05); }
-        h1, h2, h3 { margin-top: 2rem; margin-bottom: 1rem; color: #343a40; border-bottom: 1px solid #dee2e6; padding-bottom: 0.5rem; }
-        h1 { font-size: 2.5rem; }
-        h2 { font-size: 2rem; }
-        h3 { font-size: 1.75rem; }
-        pre { background-color: #e9ecef; padding: 1rem; border-radius: 5px; white-space: pre-wrap; word-wrap: break-word; font-family: "SFMono-Regular", Consolas, "Liberation Mono", Menlo, Courier, monospace; }
-        code { font-family: "SFMono-Regular", Consolas, "Liberation Mono", Menlo, Courier, monospace; font-size: 0.9em; color: #d6336c; }
-        .command { font-weight: bold; }
-        nav { padding: 1rem; background: #343a40; color: white; margin-bottom: 2rem; border-radius: 8px 8px 0 0; }
-        nav h1 { border: none; margin: 0; }
-        nav ul { list-style: none; padding: 0; margin: 0; }
-        nav li { display: inline-block; margin-right: 1rem; }
-        nav a { color: #adb5bd; text-decoration: none; }
-        nav a:hover { color: white; }
-    """)
-
-    body_parts = []
-    toc_parts = ["<ul>"]
+def _render_md_to(
+    nodes: List[_ParserNode],
+    prog: str,
+    out: IO[str],
+    width: Optional[int] = None,
+    helps: Optional[List[str]] = None,
+    path_strs: Optional[List[str]] = None,
+) -> None:
+    """Write the Markdown document to `out` without joining it first."""
+    out.writelines(_md_fragments(nodes, prog, width, helps, path_strs))
 
-    for i, node in enumerate(nodes):
-        path_str = " ".join((prog,) + node.path)
-        anchor = "cmd-" + "-".join(node.path) if node.path else "cmd-root"
 
+def _render_html_iter(
+    nodes: List[_ParserNode],
+    prog: str,
+    width: Optional[int] = None,
+    helps: Optional[List[str]] = None,
+    path_strs: Optional[List[str]] = None,
+):
+    """Yield the HTML help document as a stream of chunks.
+
+    Chunked emission lets callers pipe the document straight into a file
+    without ever holding the whole thing in memory; `_render_html` joins
+    the chunks for callers that want a single string.
+    """
+    if path_strs is None:
+        path_strs = _path_strings(nodes, prog)
+    anchors = _node_anchors(nodes)
+    yield (
+        "<!DOCTYPE html>\n"
+        '<html lang="en">\n'
+        "<head>\n"
+        '<meta charset="UTF-8">\n'
+        '<meta name="viewport" content="width=device-width, initial-scale=1.0">\n'
+        f"<title>totalhelp for {prog}</title>\n"
+        f"<style>{_CSS}</style>\n"
+        "</head>\n"
+        "<body>\n"
+        '<div class="container">\n'
+        "<nav>\n"
+        f"<h1>Help for <code>{prog}</code></h1>\n"
+        "<h2>Table of Contents</h2>\n"
+        "<ul>"
+    )
+
+    for i, node in enumerate(nodes):
         level = len(node.path)
-        toc_parts.append(
-            f'<li style="margin-left: {level * 20}px;"><a href="#{anchor}">{path_str or prog}</a></li>'
+        yield (
+            f'<li style="margin-left: {level * 20}px;"><a href="#{anchors[i]}">{path_strs[i] or prog}</a></li>'
         )
 
-        heading_level = min(level + 2, 6)
-        body_parts.append(
-            f'<h{heading_level} id="{anchor}" class="command"><code>{path_str} --help</code></h{heading_level}>'
-        )
-        help_text = _get_help_string(node.parser).strip()
-        # Basic escaping for HTML
-        help_text = (
-            help_text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    yield "</ul>\n</nav>\n<main>"
+
+    if helps is None:
+        helps = _help_strings(nodes, width)
+
+    for i, node in enumerate(nodes):
+        heading_level = min(len(node.path) + 2, 6)
+        # html.escape makes one pass; chained .replace calls walked the
+        # string three times with two throwaway copies per node.
+        help_text = html.escape(helps[i], quote=False)
+        yield (
+            f'<h{heading_level} id="{anchors[i]}" class="command"><code>{path_strs[i]} --help</code></h{heading_level}>'
+            f"<pre>{help_text}</pre>"
         )
-        body_parts.append(f"<pre>{help_text}</pre>")
-
-    toc_parts.append("</ul>")
-    toc = "".join(toc_parts)
-    body = "".join(body_parts)
-
-    return textwrap.dedent(f"""
-        <!DOCTYPE html>
-        <html lang="en">
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>totalhelp for {prog}</title>
-            <style>{css}</style>
-        </head>
-        <body>
-            <div class="container">
-                <nav>
-                    <h1>Help for <code>{prog}</code></h1>
-                    <h2>Table of Contents</h2>
-                    {toc}
-                </nav>
-                <main>{body}</main>
-            </div>
-        </body>
-        </html>
-    """).strip()
+
+    yield "</main>\n</div>\n</body>\n</html>"
+
+
+def _render_html(
+    nodes: List[_ParserNode],
+    prog: str,
+    width: Optional[int] = None,
+    helps: Optional[List[str]] = None,
+    path_strs: Optional[List[str]] = None,
+) -> str:
+    """Render the collected help nodes as a self-contained HTML file."""
+    # StringIO grows its buffer at the C level as chunks stream in, so the
+    # chunk list and the joined result never coexist in memory.
+    buf = io.StringIO()
+    _render_html_to(nodes, prog, buf, width=width, helps=helps, path_strs=path_strs)
+    return buf.getvalue()
+
+
+def _render_html_to(
+    nodes: List[_ParserNode],
+    prog: str,
+    out: IO[str],
+    width: Optional[int] = None,
+    helps: Optional[List[str]] = None,
+    path_strs: Optional[List[str]] = None,
+) -> None:
+    """Write the HTML document to `out` chunk by chunk."""
+    for chunk in _render_html_iter(
+        nodes, prog, width=width, helps=helps, path_strs=path_strs
+    ):
+        out.write(chunk)
+
+
+# Format dispatch, built once rather than per render call.
+_RENDERERS: Mapping[FormatType, Callable] = {
+    "text": _render_text,
+    "md": _render_md,
+    "html": _render_html,
+}